@@ -2,175 +2,508 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
 import os
-import subprocess
+import queue
+import ssl
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from typing import Tuple
-
-# Lock for thread-safe printing
-print_lock = Lock()
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Sequence
+
+import aiohttp
+
+try:
+    import uvloop  # boucle asyncio basée sur libuv, optionnelle
+except ImportError:
+    uvloop = None
+
+# File des sorties console, vidée par un unique thread écrivain (log_writer)
+LOG_Q = queue.SimpleQueue()
+
+# Réessais sur erreurs transitoires de Vault / du load balancer
+RETRY_STATUSES = (502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.1
+REQUEST_TIMEOUT = 30
+DRAIN_CHUNK_SIZE = 64 * 1024
+KEEPALIVE_TIMEOUT = 60
+
+# Préfixe des chemins complets de namespaces (root/ns-001, root/ns001/ns001-001)
+ROOT_PREFIX = "root/"
+
+# Code renvoyé quand aucune réponse HTTP n'a été reçue (équivalent du '000' de curl)
+TRANSPORT_ERROR = 0
+
+# Corps constant du montage KV v2, encodé une seule fois
+KV2_PAYLOAD = b'{"type":"kv","options":{"version":"2"}}'
+KV2_HEADERS = {
+    "Content-Type": "application/json",
+    "Content-Length": str(len(KV2_PAYLOAD)),
+}
+
+async def vault_post(session: aiohttp.ClientSession, url: str, headers: dict, **kwargs) -> int:
+    """
+    POST sur la session partagée et renvoie le code HTTP.
+    Réessaie jusqu'à MAX_RETRIES fois, avec backoff exponentiel, sur 502/503/504
+    et sur les erreurs de connexion (refus, déconnexion du serveur, timeout).
+    Une erreur de transport persistante renvoie TRANSPORT_ERROR, comme le
+    '000' de curl, pour que l'appelant continue.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with session.post(url, headers=headers, **kwargs) as r:
+                status = r.status
+                # Seul le code HTTP nous intéresse, mais un corps non consommé
+                # ferme la connexion au lieu de la rendre au pool keep-alive :
+                # on le vide par blocs jetés, sans le décoder ni le concaténer.
+                async for _ in r.content.iter_chunked(DRAIN_CHUNK_SIZE):
+                    pass
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            status = TRANSPORT_ERROR
+        except aiohttp.ClientError:
+            return TRANSPORT_ERROR
+        retryable = status == TRANSPORT_ERROR or status in RETRY_STATUSES
+        if not retryable or attempt == MAX_RETRIES:
+            return status
+        await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+
+async def create_namespace(session: aiohttp.ClientSession, vault_base: str, auth: dict,
+                           ns_name: str, parent_ns: str) -> int:
+    url = vault_base + "/namespaces/" + ns_name
+    headers = {**auth, "X-Vault-Namespace": parent_ns}
+    return await vault_post(session, url, headers)
+
+async def enable_kv2(session: aiohttp.ClientSession, vault_base: str, kv_headers: dict,
+                     mount_path: str) -> int:
+    """kv_headers: en-têtes du namespace cible, construits une fois par namespace."""
+    url = vault_base + "/mounts/" + mount_path
+    return await vault_post(session, url, kv_headers, data=KV2_PAYLOAD)
+
+def make_pad(width: int) -> Callable[[int], str]:
+    """
+    Renvoie un formateur d'index sur `width` chiffres (ex: 7 -> '007').
+    Le format est construit une fois par largeur, pas à chaque index.
+    """
+    return ("{:0" + str(width) + "d}").format
 
-def run_curl(args: list, insecure: bool = False) -> Tuple[int, str, str]:
+def log_writer():
     """
-    Exécute curl et renvoie (status_code, stdout_sans_code, stderr).
-    On appose le code HTTP à la fin via -w '%{http_code}' pour pouvoir le lire.
+    Seul propriétaire de stdout : écrit les blocs reçus sur LOG_Q jusqu'à
+    la sentinelle None. Les rafales sont regroupées en un seul write().
     """
-    base = ["curl", "-sS", "-X"]
-    if insecure:
-        base.insert(1, "-k")  # ignorer TLS (optionnel)
-    # On force l'impression du code HTTP à la fin de la sortie
-    cmd = base + args + ["-w", "%{http_code}"]
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-    except FileNotFoundError:
-        print("Erreur: 'curl' introuvable dans le PATH.", file=sys.stderr)
-        sys.exit(1)
-
-    out = proc.stdout or ""
-    err = proc.stderr or ""
-    # Le code HTTP sont les 3 derniers chiffres (ou 5 avec 3xx/4xx/5xx)
-    code_str = out[-3:]
-    try:
-        code = int(code_str)
-        body = out[:-3]
-    except ValueError:
-        # Si jamais introuvable, on considère tout comme body et code -1
-        code = -1
-        body = out
-    return code, body, err
-
-def create_namespace(vault_addr: str, token: str, ns_name: str, parent_ns: str, insecure: bool) -> int:
-    url = f"{vault_addr.rstrip('/')}/v1/sys/namespaces/{ns_name}"
-    cmd = [
-        "POST",
-        "-H", f"X-Vault-Token: {token}",
-        "-H", f"X-Vault-Namespace: {parent_ns}",
-        url
-    ]
-    code, body, err = run_curl(cmd, insecure=insecure)
-    return code
-
-def enable_kv2(vault_addr: str, token: str, ns_name: str, mount_path: str, insecure: bool) -> int:
-    url = f"{vault_addr.rstrip('/')}/v1/sys/mounts/{mount_path}"
-    payload = '{"type":"kv","options":{"version":"2"}}'
-    cmd = [
-        "POST",
-        "-H", f"X-Vault-Token: {token}",
-        "-H", f"X-Vault-Namespace: {ns_name}",
-        "-H", "Content-Type: application/json",
-        "--data", payload,
-        url
-    ]
-    code, body, err = run_curl(cmd, insecure=insecure)
-    return code
+    while True:
+        chunk = LOG_Q.get()
+        if chunk is None:
+            break
+        chunks = [chunk]
+        stop = False
+        try:
+            while True:
+                chunk = LOG_Q.get_nowait()
+                if chunk is None:
+                    stop = True
+                    break
+                chunks.append(chunk)
+        except queue.Empty:
+            pass
+        sys.stdout.write("".join(chunks))
+        sys.stdout.flush()
+        if stop:
+            break
+
+def start_log_writer() -> threading.Thread:
+    writer = threading.Thread(target=log_writer, daemon=True)
+    writer.start()
+    return writer
+
+def stop_log_writer(writer: threading.Thread):
+    LOG_Q.put(None)
+    writer.join()
 
 def safe_print(msg: str):
-    """Thread-safe printing"""
-    with print_lock:
-        print(msg)
-
-def create_namespace_with_kvs(vault_addr: str, token: str, ns_name: str,
-                              parent_ns: str, full_ns_path: str,
-                              mount_prefix: str, start_index: int, num_kvs: int,
-                              width_kv: int, insecure: bool) -> dict:
+    """Non-blocking printing: hands the line over to the writer thread"""
+    LOG_Q.put(msg + "\n")
+
+class LogBuffer:
+    """
+    Accumule les lignes de log d'une tâche et les transmet en un seul bloc
+    au thread écrivain, pour que le bloc d'un namespace reste contigu.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def log(self, msg: str):
+        self.lines.append(msg)
+
+    def flush(self):
+        if not self.lines:
+            return
+        LOG_Q.put("\n".join(self.lines) + "\n")
+        self.lines.clear()
+
+def make_mount_names(mount_prefix: str, start_index: int, num_kvs: int,
+                     pad_kv: Callable[[int], str]) -> tuple:
+    """Noms des montages KV d'un namespace (kv-001, kv-002, ...), calculés une fois."""
+    kv_prefix = mount_prefix + "-"
+    return tuple(kv_prefix + pad_kv(k) for k in range(start_index, start_index + num_kvs))
+
+async def create_namespace_with_kvs(session: aiohttp.ClientSession, vault_base: str,
+                                    auth: dict, ns_name: str,
+                                    parent_ns: str, full_ns_path: str,
+                                    mount_names: Sequence[str], kv_parallel: int,
+                                    buf: LogBuffer = None,
+                                    collect_results: bool = True) -> dict:
     """
-    Worker function to create a namespace and its KV engines.
-    Returns a dict with status information.
+    Worker coroutine to create a namespace and its KV engines.
+    mount_names comes from make_mount_names and is shared between namespaces.
+    Log lines go to buf (a new LogBuffer if none is given), flushed on return.
+    Returns a dict with status information; per-mount details are only kept
+    in 'kv_results' when collect_results is True, 'kv_count' is always set.
     """
+    if buf is None:
+        buf = LogBuffer()
+
     results = {
         'ns_name': full_ns_path,
         'ns_created': False,
         'ns_code': 0,
-        'kv_results': []
+        'kv_count': 0
     }
+    if collect_results:
+        results['kv_results'] = []
 
     # Create namespace
-    code_ns = create_namespace(vault_addr, token, ns_name, parent_ns, insecure)
+    code_ns = await create_namespace(session, vault_base, auth, ns_name, parent_ns)
     results['ns_code'] = code_ns
 
     if code_ns in (200, 201, 204):
-        safe_print(f"[OK] Namespace créé: {full_ns_path} (HTTP {code_ns})")
+        buf.log(f"[OK] Namespace créé: {full_ns_path} (HTTP {code_ns})")
         results['ns_created'] = True
     elif code_ns == 409:
-        safe_print(f"[EXISTE] Namespace déjà présent: {full_ns_path} (HTTP 409)")
+        buf.log(f"[EXISTE] Namespace déjà présent: {full_ns_path} (HTTP 409)")
         results['ns_created'] = True
     elif code_ns == 400:
-        safe_print(f"[WARN] Tentative de créer '{full_ns_path}' a renvoyé 400 (peut-être déjà présent ou nom invalide).")
+        buf.log(f"[WARN] Tentative de créer '{full_ns_path}' a renvoyé 400 (peut-être déjà présent ou nom invalide).")
         results['ns_created'] = True
     else:
-        safe_print(f"[ERREUR] Création namespace '{full_ns_path}' a échoué (HTTP {code_ns}). On continue quand même.")
+        buf.log(f"[ERREUR] Création namespace '{full_ns_path}' a échoué (HTTP {code_ns}). On continue quand même.")
         results['ns_created'] = True
 
     # Create KV engines
     # For namespace header, remove 'root/' prefix from full path
-    ns_for_kv = full_ns_path.replace("root/", "", 1) if full_ns_path.startswith("root/") else full_ns_path
-    for k in range(start_index, start_index + num_kvs):
-        mount = f"{mount_prefix}-{k:0{width_kv}d}"
-        code_kv = enable_kv2(vault_addr, token, ns_for_kv, mount, insecure)
-        results['kv_results'].append({'mount': mount, 'code': code_kv})
+    ns_for_kv = full_ns_path[len(ROOT_PREFIX):] if full_ns_path.startswith(ROOT_PREFIX) else full_ns_path
+    kv_headers = {**auth, "X-Vault-Namespace": ns_for_kv, **KV2_HEADERS}
+    mounts = mount_names
+    # Au plus kv_parallel montages en vol pour ce namespace
+    kv_sem = asyncio.Semaphore(kv_parallel)
+
+    async def mount_kv(mount):
+        async with kv_sem:
+            return await enable_kv2(session, vault_base, kv_headers, mount)
+
+    codes = await asyncio.gather(*[mount_kv(mount) for mount in mounts], return_exceptions=True)
+    for mount, code_kv in zip(mounts, codes):
+        results['kv_count'] += 1
+        if isinstance(code_kv, Exception):
+            buf.log(f"  [ERREUR] Montage KV v2 '{mount}' dans {full_ns_path} a échoué ({code_kv!r}).")
+            if collect_results:
+                results['kv_results'].append({'mount': mount, 'code': -1})
+            continue
+        if collect_results:
+            results['kv_results'].append({'mount': mount, 'code': code_kv})
 
         if code_kv in (200, 201, 204):
-            safe_print(f"  [OK] KV v2 monté: {full_ns_path}/{mount} (HTTP {code_kv})")
+            buf.log(f"  [OK] KV v2 monté: {full_ns_path}/{mount} (HTTP {code_kv})")
         elif code_kv == 400:
-            safe_print(f"  [WARN] Montage '{mount}' a renvoyé 400 pour {full_ns_path} (peut-être déjà monté).")
+            buf.log(f"  [WARN] Montage '{mount}' a renvoyé 400 pour {full_ns_path} (peut-être déjà monté).")
         elif code_kv == 409:
-            safe_print(f"  [EXISTE] Montage déjà présent: {full_ns_path}/{mount} (HTTP 409)")
+            buf.log(f"  [EXISTE] Montage déjà présent: {full_ns_path}/{mount} (HTTP 409)")
         else:
-            safe_print(f"  [ERREUR] Montage KV v2 '{mount}' dans {full_ns_path} a échoué (HTTP {code_kv}).")
+            buf.log(f"  [ERREUR] Montage KV v2 '{mount}' dans {full_ns_path} a échoué (HTTP {code_kv}).")
 
+    buf.flush()
     return results
 
-def create_parent_namespace_tree(vault_addr: str, token: str, parent_name: str,
-                                 ns_prefix: str, mount_prefix: str,
-                                 start_index: int, num_kvs: int, ns_level2: int,
-                                 width_parent: int, width_child: int, width_kv: int,
-                                 insecure: bool) -> dict:
+async def create_parent_namespace_tree(session: aiohttp.ClientSession, vault_base: str,
+                                       auth: dict, parent_name: str,
+                                       ns_prefix: str, mount_names: Sequence[str],
+                                       start_index: int, kv_parallel: int,
+                                       ns_level2: int,
+                                       pad_child: Callable[[int], str],
+                                       collect_results: bool = True) -> dict:
     """
-    Creates a complete parent namespace tree depth-first:
+    Creates a complete parent namespace tree depth-first, with the same
+    KV mount names (from make_mount_names) in the parent and every child:
     1. Create parent namespace
     2. Create KV engines in parent
     3. For each child namespace:
        a. Create child namespace
        b. Create KV engines in child
-    Returns a dict with status information for the entire tree.
+    Returns a dict with status information for the entire tree; the child
+    results are only kept in 'children' when collect_results is True,
+    'num_children' is always set.
     """
     results = {
         'parent': parent_name,
         'parent_created': False,
-        'children': []
+        'num_children': 0
     }
+    if collect_results:
+        results['children'] = []
 
     # Step 1: Create parent namespace
-    parent_full_path = f"root/{parent_name}"
-    safe_print(f"[PARENT] Création du parent namespace: {parent_full_path}")
-
-    parent_result = create_namespace_with_kvs(
-        vault_addr, token, parent_name, "root", parent_full_path,
-        mount_prefix, start_index, num_kvs, width_kv, insecure
+    parent_full_path = ROOT_PREFIX + parent_name
+    buf = LogBuffer()
+    buf.log(f"[PARENT] Création du parent namespace: {parent_full_path}")
+
+    parent_result = await create_namespace_with_kvs(
+        session, vault_base, auth, parent_name, "root", parent_full_path,
+        mount_names, kv_parallel, buf,
+        collect_results=collect_results
     )
     results['parent_created'] = parent_result['ns_created']
 
     # Step 2: Create child namespaces depth-first
     if ns_level2 > 0:
+        children = []
+        child_prefix = parent_name + "-"
+        child_path_prefix = parent_full_path + "/"
         for j in range(start_index, start_index + ns_level2):
-            child_name = f"{parent_name}-{j:0{width_child}d}"
-            child_full_path = f"{parent_full_path}/{child_name}"
+            child_name = child_prefix + pad_child(j)
+            child_full_path = child_path_prefix + child_name
+
+            buf = LogBuffer()
+            buf.log(f"  [CHILD] Création du child namespace: {child_full_path}")
+
+            try:
+                child_result = await create_namespace_with_kvs(
+                    session, vault_base, auth, child_name, parent_name, child_full_path,
+                    mount_names, kv_parallel, buf,
+                    collect_results=collect_results
+                )
+            except Exception as e:
+                # Un enfant en échec ne doit pas emporter ses frères
+                buf.log(f"  [EXCEPTION] Erreur lors du traitement de {child_full_path}: {e}")
+                buf.flush()
+                continue
+            children.append(child_result)
+        results['num_children'] = len(children)
+        if collect_results:
+            results['children'] = children
+
+    return results
+
+def make_ssl_context(args) -> ssl.SSLContext:
+    """Contexte TLS unique partagé par toutes les connexions du pool."""
+    ctx = ssl.create_default_context()
+    if args.insecure:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    if args.tls13:
+        ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+    return ctx
+
+def pool_size(args) -> int:
+    """
+    Taille du pool de connexions vers Vault, qui borne aussi le nombre total
+    de requêtes en vol : au-delà, les requêtes attendent une connexion libre
+    au lieu de surcharger Vault. --connections prime ; sinon chaque worker a
+    autant de connexions que de montages KV en vol dans son namespace
+    (min(x, --kv-parallel)), au moins 1 et au plus 4.
+    """
+    if args.connections:
+        return args.connections
+    per_worker = min(4, max(1, min(args.kvs, args.kv_parallel)))
+    return args.workers * per_worker
+
+def make_session(args) -> aiohttp.ClientSession:
+    """
+    Session HTTP partagée par toutes les coroutines : pool de connexions
+    keep-alive (une poignée de main TCP/TLS par connexion, pas par requête),
+    dimensionné par pool_size().
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_size(args),
+        ssl=make_ssl_context(args),
+        ttl_dns_cache=300,
+        # Sous le http_idle_timeout de Vault (5 min par défaut) : on ne
+        # réutilise pas une connexion que le serveur a déjà fermée.
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        force_close=False,
+    )
+    # Pas de délai global : l'attente d'une connexion libre dans le pool
+    # ne doit pas compter comme un timeout de requête.
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT,
+                                    sock_read=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
 
-            safe_print(f"  [CHILD] Création du child namespace: {child_full_path}")
+async def run_pool(workers: int, tasks: Iterable[tuple], func, on_done):
+    """
+    Exécute func(*task) pour chaque tâche avec `workers` coroutines fixes
+    alimentées par une asyncio.Queue. on_done(task, result) est appelé à
+    chaque fin de tâche ; result est l'exception levée en cas d'échec.
+    tasks peut être un générateur : il est consommé au fil de l'eau, la
+    file ne contenant jamais plus de 2 x workers tâches en attente.
+    """
+    q = asyncio.Queue(maxsize=workers * 2)
 
-            child_result = create_namespace_with_kvs(
-                vault_addr, token, child_name, parent_name, child_full_path,
-                mount_prefix, start_index, num_kvs, width_kv, insecure
+    async def worker():
+        while True:
+            task = await q.get()
+            try:
+                try:
+                    result = await func(*task)
+                except Exception as e:
+                    result = e
+                on_done(task, result)
+            finally:
+                q.task_done()
+
+    worker_tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    for task in tasks:
+        await q.put(task)
+    await q.join()
+    for w in worker_tasks:
+        w.cancel()
+    await asyncio.gather(*worker_tasks, return_exceptions=True)
+
+def progress_tag(shard: int, nshards: int) -> str:
+    return "[PROGRESS]" if nshards == 1 else f"[PROGRESS] (processus {shard + 1}/{nshards})"
+
+async def run_depth2(args, vault_base: str, auth: dict,
+                     pad_ns: Callable[[int], str], pad_kv: Callable[[int], str],
+                     shard: int = 0, nshards: int = 1):
+    """
+    Depth 2: create namespaces directly under root (all in parallel)
+    Only indices belonging to `shard` (out of `nshards` processes) are handled.
+    """
+    indices = range(args.start_index + shard, args.start_index + args.namespaces, nshards)
+    mount_names = make_mount_names(args.mount_prefix, args.start_index, args.kvs, pad_kv)
+
+    def gen_tasks():
+        # Tâches produites à la demande plutôt que matérialisées d'avance
+        ns_prefix = args.ns_prefix + "-"
+        for i in indices:
+            ns_name = ns_prefix + pad_ns(i)
+            full_path = ROOT_PREFIX + ns_name
+            yield (
+                vault_base,
+                auth,
+                ns_name,
+                "root",
+                full_path,
+                mount_names,
+                args.kv_parallel
             )
-            results['children'].append(child_result)
 
-    return results
+    # Exécution parallèle par args.workers coroutines
+    completed = 0
+    total = len(indices)
+    tag = progress_tag(shard, nshards)
+    # Une ligne [PROGRESS] toutes les total // 200 tâches (et à la dernière)
+    report_every = max(1, total // 200)
+
+    def on_done(task, result):
+        nonlocal completed
+        completed += 1
+        if isinstance(result, Exception):
+            safe_print(f"[EXCEPTION] Erreur lors du traitement de {task[4]}: {result}")
+        if completed % report_every == 0 or completed == total:
+            safe_print(f"{tag} {completed}/{total} namespaces traités")
+
+    async with make_session(args) as session:
+        await run_pool(args.workers, gen_tasks(),
+                       partial(create_namespace_with_kvs, session, collect_results=False),
+                       on_done)
+
+async def run_depth3(args, vault_base: str, auth: dict,
+                     pad_parent: Callable[[int], str], pad_child: Callable[[int], str],
+                     pad_kv: Callable[[int], str],
+                     shard: int = 0, nshards: int = 1):
+    """
+    Depth 3: create parent trees depth-first (parent + all children)
+    Each worker will handle a complete parent tree
+    Only parents belonging to `shard` (out of `nshards` processes) are handled.
+    """
+    n = args.namespaces
+    x = args.kvs
+    ns_level2 = args.ns_level2
+
+    indices = range(args.start_index + shard, args.start_index + n, nshards)
+    mount_names = make_mount_names(args.mount_prefix, args.start_index, x, pad_kv)
+
+    def gen_parent_tree_tasks():
+        for i in indices:
+            parent_name = args.ns_prefix + pad_parent(i)
+            yield (
+                vault_base,
+                auth,
+                parent_name,
+                args.ns_prefix,
+                mount_names,  # KV engines per namespace
+                args.start_index,
+                args.kv_parallel,
+                ns_level2,  # Number of children per parent
+                pad_child
+            )
+
+    if shard == 0:
+        safe_print(f"Création de {n} parent namespace trees (depth-first)...")
+        safe_print(f"Chaque parent aura {ns_level2} child namespaces avec {x} KV engine(s) chacun.\n")
+
+    completed = 0
+    total_trees = len(indices)
+    tag = progress_tag(shard, nshards)
+    report_every = max(1, total_trees // 200)
+
+    def on_done(task, result):
+        nonlocal completed
+        completed += 1
+        parent_name = task[2]
+        failed = isinstance(result, Exception)
+        if failed:
+            safe_print(f"[EXCEPTION] Erreur lors du traitement de {parent_name}: {result}")
+        if completed % report_every == 0 or completed == total_trees:
+            if failed:
+                safe_print(f"{tag} {completed}/{total_trees} parent trees traités - {parent_name} en échec")
+            else:
+                num_children = result['num_children']
+                safe_print(f"{tag} {completed}/{total_trees} parent trees traités - {parent_name} avec {num_children} enfants")
+
+    async with make_session(args) as session:
+        await run_pool(args.workers, gen_parent_tree_tasks(),
+                       partial(create_parent_namespace_tree, session, collect_results=False),
+                       on_done)
+
+def run_async(coro):
+    """asyncio.run, sur la boucle uvloop quand elle est installée (>= 0.18)."""
+    if uvloop is not None and hasattr(uvloop, "run"):
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+def run_shard(args, vault_base: str, auth: dict, widths: tuple,
+              shard: int = 0, nshards: int = 1):
+    """
+    Exécute la part `shard` du plan dans le processus courant, avec sa propre
+    boucle asyncio, sa propre session HTTP et son propre thread écrivain.
+    widths: (width_ns, width_kv) en depth=2, (width_parent, width_child, width_kv) en depth=3.
+    """
+    pads = [make_pad(w) for w in widths]
+    writer = start_log_writer()
+    try:
+        if args.depth == 2:
+            run_async(run_depth2(args, vault_base, auth, *pads, shard, nshards))
+        else:  # depth == 3
+            run_async(run_depth3(args, vault_base, auth, *pads, shard, nshards))
+    finally:
+        stop_log_writer(writer)
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Créer n namespaces sous root et x moteurs KV v2 par namespace dans HashiCorp Vault (via curl)."
+        description="Créer n namespaces sous root et x moteurs KV v2 par namespace dans HashiCorp Vault (via aiohttp)."
     )
     parser.add_argument("-n", "--namespaces", type=int, required=True,
                         help="Nombre de namespaces à créer (for depth=2) or number of parent namespaces (for depth=3).")
@@ -194,6 +527,16 @@ def main():
                         help="Ignorer la validation TLS (équivaut à curl -k).")
     parser.add_argument("--workers", type=int, default=20,
                         help="Nombre de workers parallèles pour créer les namespaces (défaut: 20).")
+    parser.add_argument("--kv-parallel", type=int, default=10,
+                        help="Nombre max de montages KV en parallèle dans un même namespace (défaut: 10). "
+                             "Sert aussi à dimensionner le pool de connexions si --connections n'est pas donné.")
+    parser.add_argument("--connections", type=int, default=0,
+                        help="Taille du pool de connexions HTTP vers Vault "
+                             "(défaut: workers x min(4, x, --kv-parallel), au moins workers).")
+    parser.add_argument("--tls13", action="store_true",
+                        help="Exiger TLS 1.3 au minimum pour les connexions vers Vault.")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Nombre de processus, chacun avec sa boucle asyncio, ses --workers et son pool de connexions (défaut: 1).")
     args = parser.parse_args()
 
     if not args.addr or not args.token:
@@ -209,6 +552,22 @@ def main():
         print("Erreur: n doit être > 0 et x doit être >= 0.", file=sys.stderr)
         sys.exit(2)
 
+    if args.workers <= 0:
+        print("Erreur: --workers doit être > 0.", file=sys.stderr)
+        sys.exit(2)
+
+    if args.kv_parallel <= 0:
+        print("Erreur: --kv-parallel doit être > 0.", file=sys.stderr)
+        sys.exit(2)
+
+    if args.connections < 0:
+        print("Erreur: --connections doit être >= 0.", file=sys.stderr)
+        sys.exit(2)
+
+    if args.processes <= 0:
+        print("Erreur: --processes doit être > 0.", file=sys.stderr)
+        sys.exit(2)
+
     print(f"Target Vault: {args.addr}")
 
     if depth == 2:
@@ -219,7 +578,10 @@ def main():
         print(f"Chaque child namespace aura {x} KV v2.")
         total_ns = n * ns_level2
 
-    print(f"Utilisation de {args.workers} workers parallèles.")
+    if args.processes > 1:
+        print(f"Utilisation de {args.processes} processus x {args.workers} workers parallèles.")
+    else:
+        print(f"Utilisation de {args.workers} workers parallèles.")
     print(f"Total de {total_ns} namespaces finaux à créer.\n")
 
     # Calcul des largeurs pour le formatage
@@ -231,87 +593,29 @@ def main():
 
     width_kv = max(3, len(str(args.start_index + x - 1))) if x > 0 else 3
 
+    # Préfixe d'URL et en-tête d'authentification, calculés une seule fois
+    vault_base = args.addr.rstrip('/') + "/v1/sys"
+    auth = {"X-Vault-Token": args.token}
+
     # Préparation et exécution des tâches
     if depth == 2:
-        # Depth 2: create namespaces directly under root (all in parallel)
-        tasks = []
-        for i in range(args.start_index, args.start_index + n):
-            ns_name = f"{args.ns_prefix}-{i:0{width_ns}d}"
-            full_path = f"root/{ns_name}"
-            tasks.append((
-                args.addr,
-                args.token,
-                ns_name,
-                "root",
-                full_path,
-                args.mount_prefix,
-                args.start_index,
-                x,
-                width_kv,
-                args.insecure
-            ))
-
-        # Exécution parallèle
-        completed = 0
-        total = len(tasks)
-
-        with ThreadPoolExecutor(max_workers=args.workers) as executor:
-            future_to_ns = {
-                executor.submit(create_namespace_with_kvs, *task): task[4]
-                for task in tasks
-            }
-
-            for future in as_completed(future_to_ns):
-                completed += 1
-                ns_name = future_to_ns[future]
-                try:
-                    result = future.result()
-                    safe_print(f"[PROGRESS] {completed}/{total} namespaces traités")
-                except Exception as e:
-                    safe_print(f"[EXCEPTION] Erreur lors du traitement de {ns_name}: {e}")
-
+        widths = (width_ns, width_kv)
     else:  # depth == 3
-        # Depth 3: create parent trees depth-first (parent + all children)
-        # Each worker will handle a complete parent tree
-        parent_tree_tasks = []
-        for i in range(args.start_index, args.start_index + n):
-            parent_name = f"{args.ns_prefix}{i:0{width_parent}d}"
-            parent_tree_tasks.append((
-                args.addr,
-                args.token,
-                parent_name,
-                args.ns_prefix,
-                args.mount_prefix,
-                args.start_index,
-                x,  # KV engines per namespace
-                ns_level2,  # Number of children per parent
-                width_parent,
-                width_child,
-                width_kv,
-                args.insecure
-            ))
-
-        safe_print(f"Création de {n} parent namespace trees (depth-first)...")
-        safe_print(f"Chaque parent aura {ns_level2} child namespaces avec {x} KV engine(s) chacun.\n")
+        widths = (width_parent, width_child, width_kv)
 
-        completed = 0
-        total_trees = len(parent_tree_tasks)
-
-        with ThreadPoolExecutor(max_workers=args.workers) as executor:
-            future_to_parent = {
-                executor.submit(create_parent_namespace_tree, *task): task[2]
-                for task in parent_tree_tasks
-            }
-
-            for future in as_completed(future_to_parent):
-                completed += 1
-                parent_name = future_to_parent[future]
-                try:
-                    result = future.result()
-                    num_children = len(result['children'])
-                    safe_print(f"[PROGRESS] {completed}/{total_trees} parent trees traités - {parent_name} avec {num_children} enfants")
-                except Exception as e:
-                    safe_print(f"[EXCEPTION] Erreur lors du traitement de {parent_name}: {e}")
+    if args.processes == 1:
+        run_shard(args, vault_base, auth, widths)
+    else:
+        # Un plan réparti par index entre les processus : seuls args et les
+        # largeurs traversent la frontière pickle.
+        sys.stdout.flush()
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            futures = [
+                pool.submit(run_shard, args, vault_base, auth, widths, shard, args.processes)
+                for shard in range(args.processes)
+            ]
+            for future in futures:
+                future.result()
 
     print("\nTerminé.")
 